@@ -1,25 +1,27 @@
 from functools import lru_cache
-import os
+from pathlib import Path
 
-from dotenv import load_dotenv
-from pydantic import BaseModel
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
-# Load environment variables from a .env file if present
-load_dotenv()
+# The Server/.env file, resolved independently of the working directory.
+ENV_FILE = Path(__file__).resolve().parents[1] / ".env"
 
 
-class Settings(BaseModel):
-  mongodb_uri: str = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
-  db_name: str = os.getenv("DB_NAME", "SamarthEDI")
-  jwt_secret: str = os.getenv("JWT_SECRET", "change-me-in-production")
-  jwt_algorithm: str = os.getenv("JWT_ALGORITHM", "HS256")
+class Settings(BaseSettings):
+  # Values come from environment variables (e.g. MONGODB_URI) or the .env file.
+  model_config = SettingsConfigDict(env_file=ENV_FILE, extra="ignore", frozen=True)
+
+  mongodb_uri: str = "mongodb://localhost:27017"
+  db_name: str = "SamarthEDI"
+  jwt_secret: str = "change-me-in-production"
+  jwt_algorithm: str = "HS256"
   access_token_expire_minutes: int = 60 * 24  # 1 day
-  groq_api_key: str = os.getenv("GROQ_API_KEY", "")
+  groq_api_key: str = ""
+  # bcrypt work factor; each step down halves hashing time (lower only for dev).
+  bcrypt_rounds: int = 12
 
 
 @lru_cache
 def get_settings() -> Settings:
   return Settings()
 
-
-
@@ -1,12 +1,24 @@
+import logging
 from typing import AsyncGenerator
 
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo.errors import OperationFailure, PyMongoError
 
 from .config import get_settings
 
+logger = logging.getLogger(__name__)
 settings = get_settings()
 
-client = AsyncIOMotorClient(settings.mongodb_uri)
+# One client per process; every request multiplexes over its connection pool.
+client = AsyncIOMotorClient(
+  settings.mongodb_uri,
+  maxPoolSize=100,
+  minPoolSize=10,
+  maxIdleTimeMS=60_000,
+  serverSelectionTimeoutMS=3_000,
+  # Wire compression is negotiated with the server; zlib needs no extra package.
+  compressors="zstd,zlib",
+)
 database = client[settings.db_name]
 
 
@@ -14,3 +26,54 @@ async def get_db() -> AsyncGenerator[AsyncIOMotorDatabase, None]:
   yield database
 
 
+async def _create_index(collection: str, keys, **kwargs) -> None:
+  # A build that fails on existing data (e.g. duplicates under a unique index)
+  # is logged and skipped so the API still starts; it is retried next startup.
+  try:
+    await database[collection].create_index(keys, **kwargs)
+  except OperationFailure:
+    logger.exception("Failed to create index %r on %s", keys, collection)
+
+
+async def _log_duplicate_keys(collection: str, field: str) -> None:
+  # Legacy check-then-insert writes could race and leave several documents per
+  # key; name them so they can be merged by hand before the unique build passes.
+  pipeline = [
+    {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+    {"$match": {"count": {"$gt": 1}}},
+    {"$limit": 20},
+  ]
+  duplicates = [doc["_id"] async for doc in database[collection].aggregate(pipeline)]
+  if duplicates:
+    logger.warning(
+      "%s has duplicate %s values %s; unique index will be skipped",
+      collection,
+      field,
+      duplicates,
+    )
+
+
+async def ensure_indexes() -> None:
+  """Create the indexes backing the hot query paths. Safe to run on every startup."""
+  try:
+    await _create_index("Buddy", "email", unique=True)
+    await _create_index("diary_entries", [("userId", 1), ("created_at", -1)])
+    await _create_index("mood_events", [("userId", 1), ("created_at", -1)])
+    await _create_index("events", [("userId", 1), ("start", 1)])
+    await _create_index(
+      "water_events", [("userId", 1), ("day", 1), ("reminder_time", 1)]
+    )
+    await _create_index(
+      "study_sessions",
+      [("userId", 1), ("completed", 1), ("phase_type", 1), ("session_date", 1)],
+    )
+    await _create_index(
+      "study_tasks",
+      [("userId", 1), ("status", 1), ("priority", -1), ("created_at", -1)],
+    )
+    await _log_duplicate_keys("study_streaks", "userId")
+    await _create_index("study_streaks", "userId", unique=True)
+  except PyMongoError:
+    # Mongo unreachable at boot: serve non-DB routes and retry on next startup
+    # rather than waiting out the selection timeout once per index.
+    logger.exception("Skipping index creation; MongoDB is unavailable")
@@ -1,9 +1,13 @@
+import httpx
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
+from .db import ensure_indexes
 from .routers import auth, chat, diary, events, mood, study
+from .services.mood_service import warm_up_model
 
-app = FastAPI(title="Wellness Buddy API")
+app = FastAPI(title="Wellness Buddy API", default_response_class=ORJSONResponse)
 
 origins = [
   "http://localhost:5173",
@@ -28,6 +32,32 @@ app.include_router(events.router)
 app.include_router(mood.router)
 
 
+@app.on_event("startup")
+async def create_indexes() -> None:
+  await ensure_indexes()
+
+
+@app.on_event("startup")
+async def load_mood_model() -> None:
+  # Build the CNN and compile its kernels before serving traffic.
+  warm_up_model()
+
+
+@app.on_event("startup")
+async def open_http_client() -> None:
+  # One pooled client for outbound API calls, so connections are reused across requests.
+  app.state.http = httpx.AsyncClient(
+    timeout=30.0,
+    http2=True,
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+  )
+
+
+@app.on_event("shutdown")
+async def close_http_client() -> None:
+  await app.state.http.aclose()
+
+
 @app.get("/health")
 async def health_check() -> dict[str, str]:
   return {"status": "ok"}
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class DiaryEntryBase(BaseModel):
@@ -21,8 +21,7 @@ class DiaryEntryPublic(DiaryEntryBase):
   created_at: datetime
   updated_at: datetime | None = None
 
-  class Config:
-    orm_mode = True
+  model_config = ConfigDict(from_attributes=True)
 
 
 
@@ -74,6 +74,12 @@ class StudyTaskPublic(StudyTaskBase):
   updated_at: datetime | None = None
 
 
+class StudyTasksGrouped(BaseModel):
+  pending: list[StudyTaskPublic] = []
+  in_progress: list[StudyTaskPublic] = []
+  done: list[StudyTaskPublic] = []
+
+
 class StudyStreakPublic(BaseModel):
   userId: str
   current_streak: int
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 
 
 class UserBase(BaseModel):
@@ -16,5 +16,4 @@ class UserLogin(UserBase):
 class UserPublic(UserBase):
   id: str
 
-  class Config:
-    orm_mode = True
+  model_config = ConfigDict(from_attributes=True)
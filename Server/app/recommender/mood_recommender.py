@@ -1,10 +1,15 @@
+import logging
+import os
+import tempfile
 from pathlib import Path
 from typing import List, Optional
 from urllib.parse import quote_plus
 
+import numpy as np
 import pandas as pd
 from pydantic import BaseModel
 
+logger = logging.getLogger(__name__)
 
 # Project root (EDI@), e.g. C:/Users/mohan/Desktop/EDI@
 BASE_DIR = Path(__file__).resolve().parents[3]
@@ -19,6 +24,32 @@ DATA_PATH = (
   / "genres.csv"
 )
 
+# Columnar cache of DATA_PATH, written on first load so later startups skip the CSV parse.
+CACHE_PATH = DATA_PATH.with_suffix(".parquet")
+
+# Only these columns are used for filtering / building recommendations.
+USED_COLUMNS = (
+  "valence",
+  "energy",
+  "acousticness",
+  "song_name",
+  "title",
+  "id",
+  "uri",
+  "artist",
+  "genre",
+)
+
+# The audio features are in [0, 1]; float32 is plenty and halves the bytes scanned.
+FEATURE_DTYPES = {
+  "valence": "float32",
+  "energy": "float32",
+  "acousticness": "float32",
+}
+
+# Low-cardinality text columns; as categories each distinct value is stored once.
+CATEGORICAL_COLUMNS = ("genre", "artist")
+
 
 class Song(BaseModel):
   id: str
@@ -27,8 +58,61 @@ class Song(BaseModel):
   uri: Optional[str] = None
 
 
+def _to_categories(df: pd.DataFrame) -> pd.DataFrame:
+  for col in CATEGORICAL_COLUMNS:
+    if col in df.columns:
+      df[col] = df[col].astype("category")
+  return df
+
+
+def _read_cache() -> Optional[pd.DataFrame]:
+  """Return the Parquet cache if it is up to date and readable, else None."""
+  if not CACHE_PATH.exists() or (
+    DATA_PATH.exists() and CACHE_PATH.stat().st_mtime < DATA_PATH.stat().st_mtime
+  ):
+    return None
+  try:
+    # Caches written by older versions may still hold plain strings.
+    return _to_categories(pd.read_parquet(CACHE_PATH))
+  except Exception:  # corrupt/partial file, or no Parquet engine installed
+    if not DATA_PATH.exists():
+      raise
+    logger.exception("Ignoring unreadable song cache at %s", CACHE_PATH)
+    return None
+
+
+def _write_cache(df: pd.DataFrame) -> None:
+  # Write beside the target and rename into place so concurrent workers, or a
+  # crash mid-write, never leave a partial file at CACHE_PATH.
+  tmp_path: Optional[str] = None
+  try:
+    fd, tmp_path = tempfile.mkstemp(dir=CACHE_PATH.parent, suffix=".parquet.tmp")
+    os.close(fd)
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, CACHE_PATH)
+  except (ImportError, OSError):  # pragma: no cover - cache is best-effort
+    if tmp_path is not None and os.path.exists(tmp_path):
+      os.remove(tmp_path)
+
+
+def _load_songs() -> pd.DataFrame:
+  """Load the dataset, preferring the Parquet cache when it is up to date."""
+  cached = _read_cache()
+  if cached is not None:
+    return cached
+
+  df = _to_categories(
+    pd.read_csv(
+      DATA_PATH,
+      usecols=lambda col: col in USED_COLUMNS,
+      dtype=FEATURE_DTYPES,
+    )
+  )
+  _write_cache(df)
+  return df
+
 try:
-  _df = pd.read_csv(DATA_PATH)
+  _df = _load_songs()
 except FileNotFoundError as exc:  # pragma: no cover - startup-time failure
   # Provide a clearer error message about where we expect the CSV to be.
   raise FileNotFoundError(
@@ -39,28 +123,55 @@ except FileNotFoundError as exc:  # pragma: no cover - startup-time failure
   ) from exc
 
 
-def _filter_df_for_mood(mood: str) -> pd.DataFrame:
-  """Filter the songs dataframe based on the detected mood using audio features."""
-  mood_lower = mood.lower()
-
-  if mood_lower == "happy":
-    # High valence (happier sounding)
-    return _df[_df["valence"] >= 0.6]
-  if mood_lower == "sad":
-    # Lower valence
-    return _df[_df["valence"] <= 0.4]
-  if mood_lower == "calm":
-    # More acoustic, lower energy
-    return _df[
-      (_df["acousticness"] >= 0.5)
-      & (_df["energy"] <= 0.6)
-    ]
-  if mood_lower == "angry":
-    # High energy songs
-    return _df[_df["energy"] >= 0.8]
+def _column(df: pd.DataFrame, name: str, default: object = None) -> np.ndarray:
+  """
+  Return a column as a plain object array, or a filler array if it's missing.
 
-  # Fallback if we ever get an unknown mood
-  return _df
+  Missing values read as NaN from the CSV but None from Parquet; both become
+  `default` so recommendations don't depend on which path loaded the data.
+  """
+  if name not in df.columns:
+    return np.full(len(df), default, dtype=object)
+  col = df[name].astype(object)
+  return col.where(col.notna(), default).to_numpy()
+
+
+# Keep the dataset as one array per column; recommendations only ever need
+# vector compares on the audio features and positional lookups on the rest.
+_VALENCE = _df["valence"].to_numpy(np.float32)
+_ENERGY = _df["energy"].to_numpy(np.float32)
+_ACOUSTIC = _df["acousticness"].to_numpy(np.float32)
+_NAME = _column(_df, "song_name")
+_TITLE = _column(_df, "title")
+_ID = _column(_df, "id")
+_URI = _column(_df, "uri")
+_ARTIST = _column(_df, "artist", "")
+_GENRE = _column(_df, "genre")
+del _df
+
+# Per-mood filters, computed once since the dataset never changes at runtime.
+MOOD_MASKS: dict[str, np.ndarray] = {
+  # High valence (happier sounding)
+  "happy": _VALENCE >= 0.6,
+  # Lower valence
+  "sad": _VALENCE <= 0.4,
+  # More acoustic, lower energy
+  "calm": np.logical_and(_ACOUSTIC >= 0.5, _ENERGY <= 0.6),
+  # High energy songs
+  "angry": _ENERGY >= 0.8,
+}
+
+# Row indices for each mood mask, so requests never rescan the features.
+MOOD_SUBSETS: dict[str, np.ndarray] = {
+  mood: np.flatnonzero(mask) for mood, mask in MOOD_MASKS.items()
+}
+
+_ALL_ROWS = np.arange(len(_NAME))
+
+_rng = np.random.default_rng()
+
+SPOTIFY_PREFIX = "spotify:track:"
+_HTTP_PREFIXES = ("http://", "https://")
 
 
 def recommend_songs_for_mood(mood: str, limit: int = 10) -> List[Song]:
@@ -68,38 +179,40 @@ def recommend_songs_for_mood(mood: str, limit: int = 10) -> List[Song]:
   Recommend a small set of songs for the given mood, using the existing
   genres.csv audio features dataset.
   """
-  subset = _filter_df_for_mood(mood)
+  subset = MOOD_SUBSETS.get(mood.lower())
+  if subset is None or len(subset) == 0:
+    # Unknown mood (or an empty filter): draw from the whole catalogue.
+    subset = _ALL_ROWS
 
-  if subset.empty:
-    subset = _df
-
-  if len(subset) > limit:
-    subset = subset.sample(n=limit, random_state=None)
+  # Sample row positions directly rather than copying rows with DataFrame.sample.
+  n = min(limit, len(subset))
+  picks = subset[_rng.choice(len(subset), size=n, replace=False)]
 
+  quote = quote_plus
   songs: list[Song] = []
-  for _, row in subset.iterrows():
-    raw_name = row.get("song_name") or row.get("title") or ""
+  for i in picks:
+    raw_name = _NAME[i] or _TITLE[i] or ""
     name = str(raw_name).strip()
     if not name:
       continue
 
-    song_id = str(row.get("id") or "")
+    song_id = str(_ID[i] or "")
 
     # Try to use a direct URI from the dataset if present.
-    raw_uri = row.get("uri")
+    raw_uri = _URI[i]
     uri = str(raw_uri).strip() if isinstance(raw_uri, str) else ""
 
     # If it looks like a Spotify URI, convert it to a web URL.
-    if uri.startswith("spotify:track:"):
-      spotify_id = uri.split("spotify:track:")[-1]
+    if uri.startswith(SPOTIFY_PREFIX):
+      spotify_id = uri[len(SPOTIFY_PREFIX):]
       uri = f"https://open.spotify.com/track/{spotify_id}"
 
     # If we still don't have a usable HTTP(S) URL, fall back to a YouTube search link.
-    if not uri or not (uri.startswith("http://") or uri.startswith("https://")):
-      search_query = quote_plus(f"{name} {row.get('artist', '')}".strip())
+    if not uri.startswith(_HTTP_PREFIXES):
+      search_query = quote(f"{name} {_ARTIST[i]}".strip())
       uri = f"https://www.youtube.com/results?search_query={search_query}"
 
-    raw_genre = row.get("genre")
+    raw_genre = _GENRE[i]
     genre = str(raw_genre).strip() if isinstance(raw_genre, str) else None
 
     songs.append(
@@ -112,5 +225,3 @@ def recommend_songs_for_mood(mood: str, limit: int = 10) -> List[Song]:
     )
 
   return songs
-
-
@@ -1,25 +1,48 @@
-from datetime import datetime
+import asyncio
 
+import bcrypt
 from bson import ObjectId
+from cachetools import TTLCache
 from fastapi import APIRouter, Depends, HTTPException, status
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from passlib.context import CryptContext
+from pymongo.errors import DuplicateKeyError
 
 from ..config import get_settings
 from ..db import get_db
 from ..models.user import UserCreate, UserLogin, UserPublic
+from ..utils import utcnow
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+settings = get_settings()
+
+# bcrypt only looks at the first 72 bytes; truncate explicitly like passlib did
+# so hashes created before we dropped passlib keep verifying.
+_BCRYPT_MAX_BYTES = 72
+
+
+# Short-lived cache of email -> (user id, email, hashed password) so repeated
+# login attempts skip the Mongo lookup. The password is still verified each time.
+_login_cache: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+_login_cache_lock = asyncio.Lock()
 
 
 def get_password_hash(password: str) -> str:
-  return pwd_context.hash(password)
+  salt = bcrypt.gensalt(rounds=settings.bcrypt_rounds)
+  return bcrypt.hashpw(password.encode()[:_BCRYPT_MAX_BYTES], salt).decode()
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-  return pwd_context.verify(plain_password, hashed_password)
+  return bcrypt.checkpw(
+    plain_password.encode()[:_BCRYPT_MAX_BYTES], hashed_password.encode()
+  )
+
+
+def _email_taken() -> HTTPException:
+  return HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST,
+    detail="Email already registered",
+  )
 
 
 @router.post("/register", response_model=UserPublic)
@@ -29,19 +52,24 @@ async def register_user(
 ) -> UserPublic:
   existing = await db["Buddy"].find_one({"email": payload.email})
   if existing:
-    raise HTTPException(
-      status_code=status.HTTP_400_BAD_REQUEST,
-      detail="Email already registered",
-    )
+    raise _email_taken()
 
-  hashed_password = get_password_hash(payload.password)
+  # bcrypt is deliberately slow; keep it off the event loop.
+  hashed_password = await asyncio.to_thread(get_password_hash, payload.password)
 
   doc = {
     "email": payload.email,
     "hashed_password": hashed_password,
-    "created_at": datetime.utcnow(),
+    "created_at": utcnow(),
   }
-  result = await db["Buddy"].insert_one(doc)
+  try:
+    result = await db["Buddy"].insert_one(doc)
+  except DuplicateKeyError:
+    # Lost a race with a concurrent registration; the unique index caught it.
+    raise _email_taken()
+
+  async with _login_cache_lock:
+    _login_cache.pop(payload.email, None)
 
   user = UserPublic(id=str(result.inserted_id), email=payload.email)
   return user
@@ -52,20 +80,30 @@ async def login_user(
   payload: UserLogin,
   db: AsyncIOMotorDatabase = Depends(get_db),
 ) -> UserPublic:
-  user_doc = await db["Buddy"].find_one({"email": payload.email})
-  if not user_doc:
-    raise HTTPException(
-      status_code=status.HTTP_401_UNAUTHORIZED,
-      detail="Incorrect email or password",
-    )
+  async with _login_cache_lock:
+    cached = _login_cache.get(payload.email)
 
-  if not verify_password(payload.password, user_doc["hashed_password"]):
+  if cached is None:
+    user_doc = await db["Buddy"].find_one(
+      {"email": payload.email}, {"email": 1, "hashed_password": 1}
+    )
+    if not user_doc:
+      raise HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Incorrect email or password",
+      )
+    cached = (str(user_doc["_id"]), user_doc["email"], user_doc["hashed_password"])
+    async with _login_cache_lock:
+      _login_cache[payload.email] = cached
+
+  user_id, email, hashed_password = cached
+  if not await asyncio.to_thread(verify_password, payload.password, hashed_password):
     raise HTTPException(
       status_code=status.HTTP_401_UNAUTHORIZED,
       detail="Incorrect email or password",
     )
 
-  return UserPublic(id=str(user_doc["_id"]), email=user_doc["email"])
+  return UserPublic(id=user_id, email=email)
 
 
 @router.post("/logout")
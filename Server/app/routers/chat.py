@@ -1,13 +1,25 @@
 from typing import Literal
 
 import httpx
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from pydantic import BaseModel
 
 from ..config import get_settings
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
+GROQ_CHAT_URL = "https://api.groq.com/openai/v1/chat/completions"
+
+SYSTEM_PROMPT = (
+  "You are Wellness Buddy, a friendly study coach and wellness companion for students. "
+  "Your job is to: "
+  "1) Help with studying: explain concepts in simple words, give examples, help with homework and exams, "
+  "and suggest effective study techniques. "
+  "2) Support emotional wellness: be kind and encouraging, notice when the student feels stressed or sad, "
+  "and gently suggest healthy habits like breaks, breathing, or talking to a trusted adult. "
+  "Keep answers concise, positive, and age-appropriate."
+)
+
 
 class ChatMessage(BaseModel):
   role: Literal["user", "assistant", "system"]
@@ -23,41 +35,36 @@ class ChatResponse(BaseModel):
 
 
 @router.post("", response_model=ChatResponse)
-async def chat(request: ChatRequest, settings=Depends(get_settings)) -> ChatResponse:
+async def chat(
+  request: ChatRequest,
+  http_request: Request,
+  settings=Depends(get_settings),
+) -> ChatResponse:
   if not settings.groq_api_key:
     raise HTTPException(
       status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
       detail="GROQ_API_KEY is not configured on the server.",
     )
 
-  system_prompt = (
-    "You are Wellness Buddy, a friendly study coach and wellness companion for students. "
-    "Your job is to: "
-    "1) Help with studying: explain concepts in simple words, give examples, help with homework and exams, "
-    "and suggest effective study techniques. "
-    "2) Support emotional wellness: be kind and encouraging, notice when the student feels stressed or sad, "
-    "and gently suggest healthy habits like breaks, breathing, or talking to a trusted adult. "
-    "Keep answers concise, positive, and age-appropriate."
-  )
-
   messages = [
-    {"role": "system", "content": system_prompt},
+    {"role": "system", "content": SYSTEM_PROMPT},
     *[{"role": m.role, "content": m.content} for m in request.messages],
   ]
 
+  # Shared, connection-pooled client created at app startup (see main.py).
+  client: httpx.AsyncClient = http_request.app.state.http
   try:
-    async with httpx.AsyncClient(timeout=30.0) as client:
-      response = await client.post(
-        "https://api.groq.com/openai/v1/chat/completions",
-        headers={
-          "Authorization": f"Bearer {settings.groq_api_key}",
-          "Content-Type": "application/json",
-        },
-        json={
-          "model": "llama-3.1-8b-instant",
-          "messages": messages,
-        },
-      )
+    response = await client.post(
+      GROQ_CHAT_URL,
+      headers={
+        "Authorization": f"Bearer {settings.groq_api_key}",
+        "Content-Type": "application/json",
+      },
+      json={
+        "model": "llama-3.1-8b-instant",
+        "messages": messages,
+      },
+    )
   except httpx.RequestError as exc:
     raise HTTPException(
       status_code=status.HTTP_502_BAD_GATEWAY,
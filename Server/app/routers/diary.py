@@ -12,12 +12,23 @@ from ..models.diary import (
   DiaryEntryPublic,
   DiaryEntryUpdate,
 )
+from ..utils import utcnow
 
 router = APIRouter(prefix="/diary", tags=["diary"])
 
+# Fields read by _serialize_diary; everything else is left on the server.
+_DIARY_PROJECTION = {
+  "_id": 1,
+  "userId": 1,
+  "content": 1,
+  "created_at": 1,
+  "updated_at": 1,
+}
+
 
 def _serialize_diary(doc: dict) -> DiaryEntryPublic:
-  return DiaryEntryPublic(
+  # Documents come from our own collection, so skip re-validating them.
+  return DiaryEntryPublic.model_construct(
     id=str(doc["_id"]),
     userId=doc["userId"],
     content=doc["content"],
@@ -30,6 +41,8 @@ def _serialize_diary(doc: dict) -> DiaryEntryPublic:
 async def list_entries(
   userId: str = Query(...),
   date: Optional[str] = Query(default=None),
+  skip: int = Query(default=0, ge=0),
+  limit: Optional[int] = Query(default=None, ge=1, le=500),
   db: AsyncIOMotorDatabase = Depends(get_db),
 ) -> list[DiaryEntryPublic]:
   query: dict = {"userId": userId}
@@ -48,11 +61,18 @@ async def list_entries(
 
   cursor = (
     db["diary_entries"]
-    .find(query)
+    .find(query, _DIARY_PROJECTION)
     .sort("created_at", -1)
+    .skip(skip)
+    .batch_size(200)
   )
-  docs = await cursor.to_list(length=None)
-  return [_serialize_diary(doc) for doc in docs]
+  # Unpaged by default: existing callers expect the full result set.
+  if limit is not None:
+    cursor = cursor.limit(limit)
+  entries: list[DiaryEntryPublic] = []
+  async for doc in cursor:
+    entries.append(_serialize_diary(doc))
+  return entries
 
 
 @router.post("", response_model=DiaryEntryPublic, status_code=status.HTTP_201_CREATED)
@@ -60,7 +80,7 @@ async def create_entry(
   payload: DiaryEntryCreate,
   db: AsyncIOMotorDatabase = Depends(get_db),
 ) -> DiaryEntryPublic:
-  now = datetime.utcnow()
+  now = utcnow()
   doc = {
     "userId": payload.userId,
     "content": payload.content,
@@ -79,19 +99,18 @@ async def update_entry(
   userId: str = Query(...),
   db: AsyncIOMotorDatabase = Depends(get_db),
 ) -> DiaryEntryPublic:
-  try:
-    oid = ObjectId(entry_id)
-  except Exception:
+  if not ObjectId.is_valid(entry_id):
     raise HTTPException(
       status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid diary entry id."
     )
+  oid = ObjectId(entry_id)
 
   result = await db["diary_entries"].find_one_and_update(
     {"_id": oid, "userId": userId},
     {
       "$set": {
         "content": payload.content,
-        "updated_at": datetime.utcnow(),
+        "updated_at": utcnow(),
       }
     },
     return_document=ReturnDocument.AFTER,
@@ -112,12 +131,11 @@ async def delete_entry(
   userId: str = Query(...),
   db: AsyncIOMotorDatabase = Depends(get_db),
 ) -> None:
-  try:
-    oid = ObjectId(entry_id)
-  except Exception:
+  if not ObjectId.is_valid(entry_id):
     raise HTTPException(
       status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid diary entry id."
     )
+  oid = ObjectId(entry_id)
 
   result = await db["diary_entries"].delete_one({"_id": oid, "userId": userId})
   if result.deleted_count == 0:
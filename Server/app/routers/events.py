@@ -8,12 +8,26 @@ from pymongo import ReturnDocument
 
 from ..db import get_db
 from ..models.events import EventCreate, EventPublic, EventUpdate
+from ..utils import utcnow
 
 router = APIRouter(prefix="/events", tags=["events"])
 
+# Fields read by _serialize_event; everything else is left on the server.
+_EVENT_PROJECTION = {
+  "_id": 1,
+  "userId": 1,
+  "title": 1,
+  "start": 1,
+  "end": 1,
+  "type": 1,
+  "notes": 1,
+  "created_at": 1,
+  "updated_at": 1,
+}
+
 
 def _serialize_event(doc: dict) -> EventPublic:
-  return EventPublic(
+  return EventPublic.model_construct(
     id=str(doc["_id"]),
     userId=doc["userId"],
     title=doc["title"],
@@ -31,15 +45,27 @@ async def list_events(
   userId: str = Query(...),
   time_from: Optional[datetime] = Query(default=None, alias="from"),
   time_to: Optional[datetime] = Query(default=None, alias="to"),
+  skip: int = Query(default=0, ge=0),
+  limit: Optional[int] = Query(default=None, ge=1, le=500),
   db: AsyncIOMotorDatabase = Depends(get_db),
 ) -> list[EventPublic]:
   query: dict = {"userId": userId}
   if time_from and time_to:
     query["start"] = {"$gte": time_from, "$lt": time_to}
 
-  cursor = db["events"].find(query).sort("start", 1)
-  docs = await cursor.to_list(length=None)
-  return [_serialize_event(doc) for doc in docs]
+  cursor = (
+    db["events"]
+    .find(query, _EVENT_PROJECTION)
+    .sort("start", 1)
+    .skip(skip)
+    .batch_size(200)
+  )
+  if limit is not None:
+    cursor = cursor.limit(limit)
+  events: list[EventPublic] = []
+  async for doc in cursor:
+    events.append(_serialize_event(doc))
+  return events
 
 
 @router.post("", response_model=EventPublic, status_code=status.HTTP_201_CREATED)
@@ -47,7 +73,7 @@ async def create_event(
   payload: EventCreate,
   db: AsyncIOMotorDatabase = Depends(get_db),
 ) -> EventPublic:
-  now = datetime.utcnow()
+  now = utcnow()
   doc = {
     "userId": payload.userId,
     "title": payload.title,
@@ -70,13 +96,12 @@ async def update_event(
   userId: str = Query(...),
   db: AsyncIOMotorDatabase = Depends(get_db),
 ) -> EventPublic:
-  try:
-    oid = ObjectId(event_id)
-  except Exception:
+  if not ObjectId.is_valid(event_id):
     raise HTTPException(
       status_code=status.HTTP_400_BAD_REQUEST,
       detail="Invalid event id.",
     )
+  oid = ObjectId(event_id)
 
   update_fields: dict = {k: v for k, v in payload.dict().items() if v is not None}
   if not update_fields:
@@ -84,7 +109,7 @@ async def update_event(
       status_code=status.HTTP_400_BAD_REQUEST,
       detail="No fields to update.",
     )
-  update_fields["updated_at"] = datetime.utcnow()
+  update_fields["updated_at"] = utcnow()
 
   result = await db["events"].find_one_and_update(
     {"_id": oid, "userId": userId},
@@ -106,13 +131,12 @@ async def delete_event(
   userId: str = Query(...),
   db: AsyncIOMotorDatabase = Depends(get_db),
 ) -> None:
-  try:
-    oid = ObjectId(event_id)
-  except Exception:
+  if not ObjectId.is_valid(event_id):
     raise HTTPException(
       status_code=status.HTTP_400_BAD_REQUEST,
       detail="Invalid event id.",
     )
+  oid = ObjectId(event_id)
 
   result = await db["events"].delete_one({"_id": oid, "userId": userId})
   if result.deleted_count == 0:
@@ -1,4 +1,6 @@
-from datetime import datetime, timedelta
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
 from typing import List, Optional
 
 from fastapi import (
@@ -17,22 +19,40 @@ from ..db import get_db
 from ..models.mood import MoodEventPublic, SongPublic
 from ..recommender.mood_recommender import recommend_songs_for_mood
 from ..services.mood_service import predict_mood_from_image_bytes
+from ..utils import utcnow
 
 router = APIRouter(prefix="/mood", tags=["mood"])
 
+# Dedicated threads for CNN inference. TensorFlow releases the GIL in its ops, so
+# predictions overlap without starving the default pool used by other handlers.
+_INFER_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="mood-infer")
+
+# Fields read by _serialize_mood_event, minus the (potentially large) songs list.
+_MOOD_EVENT_PROJECTION = {
+  "_id": 1,
+  "userId": 1,
+  "mood": 1,
+  "created_at": 1,
+}
+
 
 def _serialize_mood_event(doc: dict) -> MoodEventPublic:
-  return MoodEventPublic(
+  return MoodEventPublic.model_construct(
     id=str(doc["_id"]),
     userId=doc["userId"],
     mood=doc["mood"],
     created_at=doc["created_at"],
     songs=[
-      SongPublic(**song) for song in doc.get("songs", [])
+      SongPublic.model_construct(**song) for song in doc.get("songs", [])
     ],
   )
 
 
+def _recommend_song_payload(mood_label: str) -> list[dict]:
+  """Build the songs list stored on a mood event."""
+  return [song.model_dump() for song in recommend_songs_for_mood(mood_label)]
+
+
 @router.post(
   "/detect",
   response_model=MoodEventPublic,
@@ -56,17 +76,21 @@ async def detect_mood(
     )
 
   try:
-    mood_label = predict_mood_from_image_bytes(data)
+    # Model inference is CPU-bound; run it off the event loop.
+    mood_label = await asyncio.get_running_loop().run_in_executor(
+      _INFER_POOL, predict_mood_from_image_bytes, data
+    )
   except Exception as exc:  # pragma: no cover - defensive
     raise HTTPException(
       status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
       detail=f"Failed to analyze image: {exc}",
     ) from exc
 
-  songs_models = recommend_songs_for_mood(mood_label)
-  songs_payload = [song.model_dump() for song in songs_models]
+  # The songs are embedded in the inserted document, so build them first, also
+  # off the event loop.
+  songs_payload = await asyncio.to_thread(_recommend_song_payload, mood_label)
 
-  now = datetime.utcnow()
+  now = utcnow()
   doc = {
     "userId": userId,
     "mood": mood_label,
@@ -87,21 +111,40 @@ async def detect_mood(
 async def list_mood_history(
   userId: str = Query(...),
   days: Optional[int] = Query(default=7, ge=1, le=365),
+  include_songs: bool = Query(default=True),
+  skip: int = Query(default=0, ge=0),
+  limit: Optional[int] = Query(default=None, ge=1, le=500),
   db: AsyncIOMotorDatabase = Depends(get_db),
 ) -> list[MoodEventPublic]:
   """
   Return a list of mood events for a user, most recent first.
   Optionally restrict to the last `days` days (default: 7).
+  Pass `include_songs=false` to skip loading the recommended songs.
   """
   query: dict = {"userId": userId}
 
   if days is not None:
-    cutoff = datetime.utcnow() - timedelta(days=days)
+    cutoff = utcnow() - timedelta(days=days)
     query["created_at"] = {"$gte": cutoff}
 
-  cursor = db["mood_events"].find(query).sort("created_at", -1)
-  docs = await cursor.to_list(length=None)
+  projection = (
+    {**_MOOD_EVENT_PROJECTION, "songs": 1}
+    if include_songs
+    else _MOOD_EVENT_PROJECTION
+  )
+  cursor = (
+    db["mood_events"]
+    .find(query, projection)
+    .sort("created_at", -1)
+    .skip(skip)
+    .batch_size(200)
+  )
+  if limit is not None:
+    cursor = cursor.limit(limit)
+  mood_events: list[MoodEventPublic] = []
+  async for doc in cursor:
+    mood_events.append(_serialize_mood_event(doc))
 
-  return [_serialize_mood_event(doc) for doc in docs]
+  return mood_events
 
 
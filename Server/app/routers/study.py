@@ -1,12 +1,13 @@
-from datetime import datetime, timedelta
+import logging
+from datetime import datetime
 from pathlib import Path
 from typing import List, Optional
 
 from bson import ObjectId
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
 from fastapi.responses import FileResponse
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from pymongo import ReturnDocument
+from pymongo import ReturnDocument, WriteConcern
 
 from ..db import get_db
 from ..models.study import (
@@ -15,122 +16,193 @@ from ..models.study import (
   StudyStreakPublic,
   StudyTaskCreate,
   StudyTaskPublic,
+  StudyTasksGrouped,
   StudyTaskUpdate,
   WaterReminderCreate,
   WaterReminderPublic,
   WaterReminderUpdate,
   WaterScheduleCreate,
 )
+from ..utils import utcnow
 
 router = APIRouter(prefix="/study", tags=["study"])
 
+logger = logging.getLogger(__name__)
 
-# Absolute path to the bundled white-noise track at the project root.
-# Currently uses the WhatsApp audio file as the default background sound.
-WHITE_NOISE_PATH = (
+
+# Absolute paths to the bundled white-noise tracks at the project root.
+# A re-encoded Opus copy (see Server/README.md) is a fraction of the size of the
+# original 320 kbps WhatsApp MPEG, so serve it whenever it is present.
+WHITE_NOISE_OPUS_PATH = Path(__file__).resolve().parents[3] / "white_noise.opus"
+WHITE_NOISE_MPEG_PATH = (
   Path(__file__).resolve().parents[3]
   / "WhatsApp Audio 2025-12-05 at 12.17.07 AM.mpeg"
 )
 
+if WHITE_NOISE_OPUS_PATH.is_file():
+  WHITE_NOISE_PATH = WHITE_NOISE_OPUS_PATH
+  _WHITE_NOISE_MEDIA_TYPE = "audio/ogg"
+else:
+  WHITE_NOISE_PATH = WHITE_NOISE_MPEG_PATH
+  _WHITE_NOISE_MEDIA_TYPE = "audio/mpeg"
+
+# The bundled file doesn't change while the server runs, so resolve it once.
+_WHITE_NOISE_STR = str(WHITE_NOISE_PATH)
+_WHITE_NOISE_EXISTS = WHITE_NOISE_PATH.is_file()
+
+
+# Fields read by the serializers below; everything else is left on the server.
+_WATER_REMINDER_PROJECTION = {
+  "_id": 1,
+  "userId": 1,
+  "reminder_time": 1,
+  "status": 1,
+  "day": 1,
+}
+_TASK_PROJECTION = {
+  "_id": 1,
+  "userId": 1,
+  "title": 1,
+  "description": 1,
+  "priority": 1,
+  "status": 1,
+  "created_at": 1,
+  "updated_at": 1,
+}
+
+
+# List endpoints return plain dicts; response_model still shapes the output
+# and ORJSONResponse encodes them without building a model per row here.
+# Single-object responses use model_construct, as the data is our own.
+def _serialize_water_reminder(doc: dict) -> dict:
+  return {
+    "id": str(doc["_id"]),
+    "userId": doc["userId"],
+    "reminder_time": doc["reminder_time"],
+    "status": doc["status"],
+    "day": doc["day"],
+  }
+
+
+def _serialize_task(doc: dict) -> dict:
+  return {
+    "id": str(doc["_id"]),
+    "userId": doc["userId"],
+    "title": doc["title"],
+    "description": doc.get("description"),
+    "priority": doc.get("priority", "medium"),
+    "status": doc.get("status", "pending"),
+    "created_at": doc["created_at"],
+    "updated_at": doc.get("updated_at"),
+  }
+
 
 @router.get("/white-noise")
 async def get_white_noise() -> FileResponse:
   """
   Stream the default rain white-noise track used by the Study/Pomodoro timer.
   """
-  if not WHITE_NOISE_PATH.exists():
+  if not _WHITE_NOISE_EXISTS:
     raise HTTPException(
       status_code=status.HTTP_404_NOT_FOUND,
       detail="White noise audio file not found.",
     )
 
   return FileResponse(
-    path=str(WHITE_NOISE_PATH),
-    media_type="audio/mpeg",
-    filename="WhatsApp Audio 2025-12-05 at 12.17.07 AM.mpeg",
+    path=_WHITE_NOISE_STR,
+    media_type=_WHITE_NOISE_MEDIA_TYPE,
+    filename=WHITE_NOISE_PATH.name,
+    # Let browsers seek and keep the track cached between study sessions.
+    headers={
+      "Accept-Ranges": "bytes",
+      "Cache-Control": "public, max-age=86400, immutable",
+    },
   )
 
 
+def _streak_update_pipeline(day_str: str) -> list[dict]:
+  """
+  Aggregation-pipeline update that records activity on `day_str`, so Mongo
+  does the streak math atomically in a single round-trip.
+  """
+  # Client-supplied; $literal stops a value like "$current_streak" from being
+  # read as a field path inside the pipeline.
+  day = {"$literal": day_str}
+  days_since_last = {
+    "$dateDiff": {
+      "startDate": {"$dateFromString": {"dateString": "$last_active_date"}},
+      "endDate": {"$dateFromString": {"dateString": day}},
+      "unit": "day",
+    }
+  }
+  active_dates = {"$ifNull": ["$active_dates", []]}
+
+  return [
+    {
+      "$set": {
+        "current_streak": {
+          "$cond": [
+            # Already counted today; keep the streak as-is.
+            {"$eq": ["$last_active_date", day]},
+            "$current_streak",
+            {
+              "$cond": [
+                {"$eq": [days_since_last, 1]},
+                {"$add": ["$current_streak", 1]},
+                1,
+              ]
+            },
+          ]
+        },
+        "last_active_date": day,
+        "active_dates": {
+          "$cond": [
+            {"$in": [day, active_dates]},
+            active_dates,
+            {"$concatArrays": [active_dates, [day]]},
+          ]
+        },
+        "updated_at": utcnow(),
+      }
+    },
+    {"$set": {"longest_streak": {"$max": ["$longest_streak", "$current_streak"]}}},
+  ]
+
+
 async def _update_streak_for_date(
   db: AsyncIOMotorDatabase, user_id: str, day_str: str
 ) -> StudyStreakPublic:
   """Increment or create streak data for a given day."""
-  streaks = db["study_streaks"]
-  existing = await streaks.find_one({"userId": user_id})
-
-  if existing is None:
-    doc = {
-      "userId": user_id,
-      "current_streak": 1,
-      "longest_streak": 1,
-      "last_active_date": day_str,
-      "active_dates": [day_str],
-      "updated_at": datetime.utcnow(),
-    }
-    await streaks.insert_one(doc)
-    return StudyStreakPublic(**doc)
-
-  last = existing.get("last_active_date")
-  current_streak = int(existing.get("current_streak", 0))
-  longest_streak = int(existing.get("longest_streak", 0))
-
-  if last == day_str:
-    # Already counted today; just ensure day is recorded in active_dates.
-    active_dates = existing.get("active_dates", [])
-    if day_str not in active_dates:
-      active_dates.append(day_str)
-    updated = {
-      **existing,
-      "active_dates": active_dates,
-      "updated_at": datetime.utcnow(),
-    }
-    await streaks.update_one({"_id": existing["_id"]}, {"$set": updated})
-    return StudyStreakPublic(
-      userId=updated["userId"],
-      current_streak=updated["current_streak"],
-      longest_streak=updated["longest_streak"],
-      last_active_date=updated["last_active_date"],
-      active_dates=updated.get("active_dates", []),
-    )
-
-  # Compute difference in days between last and current.
-  day = datetime.fromisoformat(day_str).date()
-  last_date = (
-    datetime.fromisoformat(last).date() if last else None
+  updated = await db["study_streaks"].find_one_and_update(
+    {"userId": user_id},
+    _streak_update_pipeline(day_str),
+    upsert=True,
+    return_document=ReturnDocument.AFTER,
   )
 
-  if last_date and (day - last_date) == timedelta(days=1):
-    current_streak += 1
-  else:
-    current_streak = 1
-
-  if current_streak > longest_streak:
-    longest_streak = current_streak
-
-  active_dates = existing.get("active_dates", [])
-  if day_str not in active_dates:
-    active_dates.append(day_str)
-
-  update_doc = {
-    "current_streak": current_streak,
-    "longest_streak": longest_streak,
-    "last_active_date": day_str,
-    "active_dates": active_dates,
-    "updated_at": datetime.utcnow(),
-  }
-
-  await streaks.update_one(
-    {"_id": existing["_id"]},
-    {"$set": update_doc},
+  return StudyStreakPublic.model_construct(
+    userId=updated["userId"],
+    current_streak=updated["current_streak"],
+    longest_streak=updated["longest_streak"],
+    last_active_date=updated["last_active_date"],
+    active_dates=updated.get("active_dates", []),
   )
 
-  return StudyStreakPublic(
-    userId=existing["userId"],
-    current_streak=current_streak,
-    longest_streak=longest_streak,
-    last_active_date=day_str,
-    active_dates=active_dates,
-  )
+
+async def _update_streak_in_background(
+  db: AsyncIOMotorDatabase, user_id: str, day_str: str
+) -> None:
+  """Run a streak update after the response has been sent, logging any failure."""
+  try:
+    # Nobody reads the result here, so use update_one and leave the (ever
+    # growing) active_dates array on the server.
+    await db["study_streaks"].update_one(
+      {"userId": user_id},
+      _streak_update_pipeline(day_str),
+      upsert=True,
+    )
+  except Exception:
+    logger.exception("Failed to update study streak for user %s", user_id)
 
 
 @router.post("/sessions", response_model=StudyStreakPublic)
@@ -145,7 +217,7 @@ async def create_session(
     "session_date": payload.session_date,
     "phase_type": payload.phase_type,
     "completed": payload.completed,
-    "created_at": datetime.utcnow(),
+    "created_at": utcnow(),
   }
   await db["study_sessions"].insert_one(doc)
 
@@ -155,7 +227,7 @@ async def create_session(
 
   existing = await db["study_streaks"].find_one({"userId": payload.userId})
   if existing:
-    return StudyStreakPublic(
+    return StudyStreakPublic.model_construct(
       userId=existing["userId"],
       current_streak=existing.get("current_streak", 0),
       longest_streak=existing.get("longest_streak", 0),
@@ -164,7 +236,7 @@ async def create_session(
     )
 
   # No streak yet.
-  return StudyStreakPublic(
+  return StudyStreakPublic.model_construct(
     userId=payload.userId,
     current_streak=0,
     longest_streak=0,
@@ -178,28 +250,32 @@ async def sessions_summary(
   userId: str = Query(...),
   day: Optional[str] = Query(default=None),
   db: AsyncIOMotorDatabase = Depends(get_db),
-) -> StudySessionSummary:
-  query_all = {"userId": userId, "completed": True, "phase_type": "focus"}
-  cursor_all = db["study_sessions"].find(query_all)
-  docs_all = await cursor_all.to_list(length=None)
-
-  total_minutes = sum(int(doc.get("duration_minutes", 0)) for doc in docs_all)
-  total_sessions = len(docs_all)
-
-  day_minutes = None
-  day_sessions = None
-
+) -> dict:
+  # Let Mongo sum the sessions instead of shipping every document back.
+  group: dict = {
+    "_id": None,
+    "total_minutes": {"$sum": "$duration_minutes"},
+    "total_sessions": {"$sum": 1},
+  }
   if day:
-    docs_day = [doc for doc in docs_all if doc.get("session_date") == day]
-    day_minutes = sum(int(doc.get("duration_minutes", 0)) for doc in docs_day)
-    day_sessions = len(docs_day)
-
-  return StudySessionSummary(
-    total_minutes=total_minutes,
-    total_sessions=total_sessions,
-    day_minutes=day_minutes,
-    day_sessions=day_sessions,
-  )
+    # $literal keeps a client-supplied "$..." value from reading as a field path.
+    is_day = {"$eq": ["$session_date", {"$literal": day}]}
+    group["day_minutes"] = {"$sum": {"$cond": [is_day, "$duration_minutes", 0]}}
+    group["day_sessions"] = {"$sum": {"$cond": [is_day, 1, 0]}}
+
+  pipeline = [
+    {"$match": {"userId": userId, "completed": True, "phase_type": "focus"}},
+    {"$group": group},
+  ]
+  results = await db["study_sessions"].aggregate(pipeline).to_list(length=1)
+  totals = results[0] if results else {}
+
+  return {
+    "total_minutes": int(totals.get("total_minutes", 0)),
+    "total_sessions": int(totals.get("total_sessions", 0)),
+    "day_minutes": int(totals.get("day_minutes", 0)) if day else None,
+    "day_sessions": int(totals.get("day_sessions", 0)) if day else None,
+  }
 
 
 @router.get("/water", response_model=List[WaterReminderPublic])
@@ -207,33 +283,26 @@ async def list_water_reminders(
   userId: str = Query(...),
   day: str = Query(...),
   db: AsyncIOMotorDatabase = Depends(get_db),
-) -> list[WaterReminderPublic]:
+) -> list[dict]:
   cursor = (
     db["water_events"]
-    .find({"userId": userId, "day": day})
+    .find({"userId": userId, "day": day}, _WATER_REMINDER_PROJECTION)
     .sort("reminder_time", 1)
   )
-  docs = await cursor.to_list(length=None)
-  return [
-    WaterReminderPublic(
-      id=str(doc["_id"]),
-      userId=doc["userId"],
-      reminder_time=doc["reminder_time"],
-      status=doc["status"],
-      day=doc["day"],
-    )
-    for doc in docs
-  ]
+  reminders: list[dict] = []
+  async for doc in cursor:
+    reminders.append(_serialize_water_reminder(doc))
+  return reminders
 
 
 @router.post("/water/bulk", response_model=List[WaterReminderPublic])
 async def create_water_schedule(
   payload: WaterScheduleCreate,
   db: AsyncIOMotorDatabase = Depends(get_db),
-) -> list[WaterReminderPublic]:
+) -> list[dict]:
   # If schedule for the day already exists, just return it.
   existing = await db["water_events"].find_one(
-    {"userId": payload.userId, "day": payload.day}
+    {"userId": payload.userId, "day": payload.day}, {"_id": 1}
   )
   if existing:
     return await list_water_reminders(
@@ -252,6 +321,7 @@ async def create_water_schedule(
   start_minutes = payload.start_hour * 60
   end_minutes = payload.end_hour * 60
 
+  now = utcnow()
   current = start_minutes
   while current < end_minutes:
     hours, minutes = divmod(current, 60)
@@ -268,7 +338,7 @@ async def create_water_schedule(
         "reminder_time": reminder_dt,
         "status": "pending",
         "day": payload.day,
-        "created_at": datetime.utcnow(),
+        "created_at": now,
       }
     )
     current += payload.interval_minutes
@@ -276,7 +346,12 @@ async def create_water_schedule(
   if not reminders:
     return []
 
-  result = await db["water_events"].insert_many(reminders)
+  # Reminders are independent and can be regenerated, so skip ordered inserts
+  # and the journal wait.
+  water_events = db["water_events"].with_options(
+    write_concern=WriteConcern(w=1, j=False)
+  )
+  result = await water_events.insert_many(reminders, ordered=False)
   inserted_ids = result.inserted_ids
 
   docs = [
@@ -287,18 +362,7 @@ async def create_water_schedule(
     for i in range(len(inserted_ids))
   ]
 
-  docs.sort(key=lambda d: d["reminder_time"])
-
-  return [
-    WaterReminderPublic(
-      id=str(doc["_id"]),
-      userId=doc["userId"],
-      reminder_time=doc["reminder_time"],
-      status=doc["status"],
-      day=doc["day"],
-    )
-    for doc in docs
-  ]
+  return [_serialize_water_reminder(doc) for doc in docs]
 
 
 @router.put("/water/{reminder_id}", response_model=WaterReminderPublic)
@@ -308,12 +372,11 @@ async def update_water_status(
   userId: str = Query(...),
   db: AsyncIOMotorDatabase = Depends(get_db),
 ) -> WaterReminderPublic:
-  try:
-    oid = ObjectId(reminder_id)
-  except Exception:
+  if not ObjectId.is_valid(reminder_id):
     raise HTTPException(
       status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid reminder id."
     )
+  oid = ObjectId(reminder_id)
 
   result = await db["water_events"].find_one_and_update(
     {"_id": oid, "userId": userId},
@@ -326,7 +389,7 @@ async def update_water_status(
       detail="Water reminder not found.",
     )
 
-  return WaterReminderPublic(
+  return WaterReminderPublic.model_construct(
     id=str(result["_id"]),
     userId=result["userId"],
     reminder_time=result["reminder_time"],
@@ -341,7 +404,7 @@ async def list_tasks(
   status_filter: Optional[str] = Query(default=None, alias="status"),
   priority_filter: Optional[str] = Query(default=None, alias="priority"),
   db: AsyncIOMotorDatabase = Depends(get_db),
-) -> list[StudyTaskPublic]:
+) -> list[dict]:
   query: dict = {"userId": userId}
   if status_filter:
     query["status"] = status_filter
@@ -350,7 +413,7 @@ async def list_tasks(
 
   cursor = (
     db["study_tasks"]
-    .find(query)
+    .find(query, _TASK_PROJECTION)
     .sort(
       [
         ("priority", -1),
@@ -358,20 +421,46 @@ async def list_tasks(
       ]
     )
   )
-  docs = await cursor.to_list(length=None)
-  return [
-    StudyTaskPublic(
-      id=str(doc["_id"]),
-      userId=doc["userId"],
-      title=doc["title"],
-      description=doc.get("description"),
-      priority=doc.get("priority", "medium"),
-      status=doc.get("status", "pending"),
-      created_at=doc["created_at"],
-      updated_at=doc.get("updated_at"),
-    )
-    for doc in docs
+  tasks: list[dict] = []
+  async for doc in cursor:
+    tasks.append(_serialize_task(doc))
+  return tasks
+
+
+@router.get("/tasks/grouped", response_model=StudyTasksGrouped)
+async def list_tasks_grouped(
+  userId: str = Query(...),
+  db: AsyncIOMotorDatabase = Depends(get_db),
+) -> dict:
+  """
+  Return a user's tasks bucketed by status (e.g. for a Kanban board) in one
+  round-trip, instead of one `GET /tasks?status=...` request per column.
+  """
+  statuses = ("pending", "in_progress", "done")
+  pipeline = [
+    {"$match": {"userId": userId}},
+    # Priorities are strings, so rank them explicitly (high first); missing
+    # values rank as "medium", matching what the serializer reports.
+    {
+      "$addFields": {
+        "_priority_rank": {
+          "$indexOfArray": [
+            ["low", "medium", "high"],
+            {"$ifNull": ["$priority", "medium"]},
+          ]
+        }
+      }
+    },
+    {"$sort": {"_priority_rank": -1, "created_at": -1}},
+    {"$project": _TASK_PROJECTION},
+    {"$facet": {s: [{"$match": {"status": s}}] for s in statuses}},
   ]
+  results = await db["study_tasks"].aggregate(pipeline).to_list(length=1)
+  buckets = results[0] if results else {}
+
+  return {
+    s: [_serialize_task(doc) for doc in buckets.get(s, [])] for s in statuses
+  }
 
 
 @router.post("/tasks", response_model=StudyTaskPublic, status_code=status.HTTP_201_CREATED)
@@ -379,7 +468,7 @@ async def create_task(
   payload: StudyTaskCreate,
   db: AsyncIOMotorDatabase = Depends(get_db),
 ) -> StudyTaskPublic:
-  now = datetime.utcnow()
+  now = utcnow()
   doc = {
     "userId": payload.userId,
     "title": payload.title,
@@ -391,7 +480,7 @@ async def create_task(
   }
   result = await db["study_tasks"].insert_one(doc)
   doc["_id"] = result.inserted_id
-  return StudyTaskPublic(
+  return StudyTaskPublic.model_construct(
     id=str(doc["_id"]),
     userId=doc["userId"],
     title=doc["title"],
@@ -407,15 +496,15 @@ async def create_task(
 async def update_task(
   task_id: str,
   payload: StudyTaskUpdate,
+  background_tasks: BackgroundTasks,
   userId: str = Query(...),
   db: AsyncIOMotorDatabase = Depends(get_db),
 ) -> StudyTaskPublic:
-  try:
-    oid = ObjectId(task_id)
-  except Exception:
+  if not ObjectId.is_valid(task_id):
     raise HTTPException(
       status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid task id."
     )
+  oid = ObjectId(task_id)
 
   update_fields: dict = {k: v for k, v in payload.dict().items() if v is not None}
   if not update_fields:
@@ -424,15 +513,8 @@ async def update_task(
       detail="No fields to update.",
     )
 
-  update_fields["updated_at"] = datetime.utcnow()
-
-  # Need to know if status changed to done to update streaks.
-  existing = await db["study_tasks"].find_one({"_id": oid, "userId": userId})
-  if not existing:
-    raise HTTPException(
-      status_code=status.HTTP_404_NOT_FOUND,
-      detail="Task not found.",
-    )
+  now = utcnow()
+  update_fields["updated_at"] = now
 
   result = await db["study_tasks"].find_one_and_update(
     {"_id": oid, "userId": userId},
@@ -445,13 +527,14 @@ async def update_task(
       detail="Task not found.",
     )
 
-  # If task moved to done, update streaks for today.
+  # If task moved to done, update streaks for today. The task response doesn't
+  # include the streak, so don't make the client wait for it.
   new_status = update_fields.get("status")
   if new_status == "done":
-    today_str = datetime.utcnow().date().isoformat()
-    await _update_streak_for_date(db, userId, today_str)
+    today_str = now.date().isoformat()
+    background_tasks.add_task(_update_streak_in_background, db, userId, today_str)
 
-  return StudyTaskPublic(
+  return StudyTaskPublic.model_construct(
     id=str(result["_id"]),
     userId=result["userId"],
     title=result["title"],
@@ -469,12 +552,11 @@ async def delete_task(
   userId: str = Query(...),
   db: AsyncIOMotorDatabase = Depends(get_db),
 ) -> None:
-  try:
-    oid = ObjectId(task_id)
-  except Exception:
+  if not ObjectId.is_valid(task_id):
     raise HTTPException(
       status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid task id."
     )
+  oid = ObjectId(task_id)
 
   result = await db["study_tasks"].delete_one({"_id": oid, "userId": userId})
   if result.deleted_count == 0:
@@ -493,7 +575,7 @@ async def get_streak(
 ) -> StudyStreakPublic:
   existing = await db["study_streaks"].find_one({"userId": userId})
   if not existing:
-    return StudyStreakPublic(
+    return StudyStreakPublic.model_construct(
       userId=userId,
       current_streak=0,
       longest_streak=0,
@@ -501,7 +583,7 @@ async def get_streak(
       active_dates=[],
     )
 
-  return StudyStreakPublic(
+  return StudyStreakPublic.model_construct(
     userId=existing["userId"],
     current_streak=existing.get("current_streak", 0),
     longest_streak=existing.get("longest_streak", 0),
@@ -0,0 +1,11 @@
+from datetime import datetime, timezone
+
+
+def utcnow() -> datetime:
+  """
+  Naive UTC timestamp, replacing the deprecated `datetime.utcnow()`.
+
+  Stored values stay naive so they round-trip unchanged through the Motor
+  client (which is not `tz_aware`) and serialize the same on create and read.
+  """
+  return datetime.now(timezone.utc).replace(tzinfo=None)